@@ -0,0 +1,15 @@
+import multiprocessing
+import os
+
+# Each uvicorn worker runs its own event loop and can keep hundreds of
+# translations in flight, so a worker per core is plenty
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Workers inherit this, so demo.py can split the deployment's RPM/TPM quota between them
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Long translations and streamed responses can legitimately take a while
+timeout = 120
+graceful_timeout = 30
+keepalive = 5